@@ -14,6 +14,22 @@ from src.data.yaml_loader import YAMLDataLoader
 from src.core.cev_calculator_v24 import CEVCalculatorV24, CalculationConfig
 
 
+# 要评估的单位和场景
+# (unit_id, weapon_mode, display_name, scenarios_to_run)
+UNITS_TO_EVALUATE = (
+    ("Liberator_BlackOps", "AG", "掠袭解放者", ("standard",)),
+    ("ColossusTaldarim", "upgraded", "普通天罚行者(快充)", ("standard",)),
+    ("ColossusTaldarim", "base", "普通天罚行者(无升级)", ("standard",)),
+    ("ColossusTaldarim_SoulArtificer", None, "灵魂巧匠天罚行者", ("standard",)),
+    ("ImpalerDehaka", None, "穿刺者", ("standard", "vs_armored")),
+    ("SiegeTank", "siege", "攻城坦克", ("standard", "vs_armored")),
+    # 龙骑士待添加
+)
+
+# 非标准场景的显示名称
+SCENARIO_NAMES = {"vs_armored": "对重甲", "vs_light": "对轻甲"}
+
+
 def setup_logging():
     """设置日志"""
     logging.basicConfig(
@@ -74,19 +90,7 @@ def evaluate_elite_units(calculator: CEVCalculatorV24) -> List[Dict[str, Any]]:
     """评估六大精英单位"""
     results = []
     
-    # 定义要评估的单位和场景
-    # (unit_id, weapon_mode, display_name, scenarios_to_run)
-    units_to_evaluate = [
-        ("Liberator_BlackOps", "AG", "掠袭解放者", ["standard"]),
-        ("ColossusTaldarim", "upgraded", "普通天罚行者(快充)", ["standard"]),
-        ("ColossusTaldarim", "base", "普通天罚行者(无升级)", ["standard"]),
-        ("ColossusTaldarim_SoulArtificer", None, "灵魂巧匠天罚行者", ["standard"]),
-        ("ImpalerDehaka", None, "穿刺者", ["standard", "vs_armored"]),
-        ("SiegeTank", "siege", "攻城坦克", ["standard", "vs_armored"]),
-        # 龙骑士待添加
-    ]
-    
-    for unit_id, weapon_mode, display_name_base, scenarios in units_to_evaluate:
+    for unit_id, weapon_mode, display_name_base, scenarios in UNITS_TO_EVALUATE:
         for scenario in scenarios:
             try:
                 # 计算CEV
@@ -100,8 +104,7 @@ def evaluate_elite_units(calculator: CEVCalculatorV24) -> List[Dict[str, Any]]:
                 # 创建唯一的显示名称
                 display_name = display_name_base
                 if scenario != "standard":
-                    scenario_map = {"vs_armored": "对重甲", "vs_light": "对轻甲"}
-                    display_name += f" ({scenario_map.get(scenario, scenario)})"
+                    display_name += f" ({SCENARIO_NAMES.get(scenario, scenario)})"
 
                 result["display_name"] = display_name
                 results.append(result)
@@ -122,28 +125,24 @@ def evaluate_elite_units(calculator: CEVCalculatorV24) -> List[Dict[str, Any]]:
 
 def create_ranking_table(results: List[Dict[str, Any]]) -> pd.DataFrame:
     """创建排名表"""
-    # 按CEV排序
-    sorted_results = sorted(results, key=lambda x: x['cev'], reverse=True)
-    
-    # 创建表格数据
-    table_data = []
-    for i, result in enumerate(sorted_results, 1):
-        table_data.append({
-            "排名": i,
-            "单位名称": result['display_name'],
-            "指挥官": result['commander'],
-            "场景": result['scenario'],
-            "资源效率(CEV)": result['cev'],
-            "人口效率(CEV/Pop)": result['cev_per_pop'],
-            "DPS_eff": result['components']['dps_eff'],
-            "EHP": result['components']['ehp'],
-        })
+    # 按列构建表格，再整体按CEV排序（稳定排序，同分保持原顺序）
+    df = pd.DataFrame({
+        "单位名称": [result['display_name'] for result in results],
+        "指挥官": [result['commander'] for result in results],
+        "场景": [result['scenario'] for result in results],
+        "资源效率(CEV)": [result['cev'] for result in results],
+        "人口效率(CEV/Pop)": [result['cev_per_pop'] for result in results],
+        "DPS_eff": [result['components']['dps_eff'] for result in results],
+        "EHP": [result['components']['ehp'] for result in results],
+    })
+    df = df.sort_values("资源效率(CEV)", ascending=False, kind="stable", ignore_index=True)
+    df.insert(0, "排名", range(1, len(df) + 1))
     
-    return pd.DataFrame(table_data)
+    return df
 
 
-def save_results(results: List[Dict[str, Any]], output_dir: Path):
-    """保存结果"""
+def save_results(results: List[Dict[str, Any]], output_dir: Path) -> pd.DataFrame:
+    """保存结果，返回排名表供调用方复用"""
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # 保存JSON格式
@@ -154,21 +153,25 @@ def save_results(results: List[Dict[str, Any]], output_dir: Path):
     df = create_ranking_table(results)
     df.to_csv(output_dir / "v24_elite_units_ranking.csv", index=False, encoding="utf-8")
     
-    # 保存Markdown格式
-    with open(output_dir / "v24_elite_units_ranking.md", "w", encoding="utf-8") as f:
-        f.write("# v2.4 六大精英单位CEV排名\n\n")
-        f.write(df.to_markdown(index=False))
-        f.write("\n\n## 详细计算结果\n\n")
-        
-        for result in sorted(results, key=lambda x: x['cev'], reverse=True):
-            f.write(f"### {result['display_name']}\n")
-            f.write(f"- **CEV**: {result['cev']}\n")
-            f.write(f"- **CEV/Pop**: {result['cev_per_pop']}\n")
-            f.write(f"- **指挥官**: {result['commander']}\n")
-            f.write(f"- **计算参数**:\n")
-            for key, value in result['components'].items():
-                f.write(f"  - {key}: {value}\n")
-            f.write("\n")
+    # 保存Markdown格式，先拼接完整内容再一次写入
+    parts = [
+        "# v2.4 六大精英单位CEV排名\n\n",
+        df.to_markdown(index=False),
+        "\n\n## 详细计算结果\n\n",
+    ]
+    
+    for result in sorted(results, key=lambda x: x['cev'], reverse=True):
+        parts.append(f"### {result['display_name']}\n")
+        parts.append(f"- **CEV**: {result['cev']}\n")
+        parts.append(f"- **CEV/Pop**: {result['cev_per_pop']}\n")
+        parts.append(f"- **指挥官**: {result['commander']}\n")
+        parts.append(f"- **计算参数**:\n")
+        parts.extend(f"  - {key}: {value}\n" for key, value in result['components'].items())
+        parts.append("\n")
+    
+    (output_dir / "v24_elite_units_ranking.md").write_text("".join(parts), encoding="utf-8")
+    
+    return df
 
 
 def main():
@@ -192,11 +195,10 @@ def main():
     
     # 保存结果
     output_dir = Path("output/v24_evaluation")
-    save_results(results, output_dir)
+    df = save_results(results, output_dir)
     
     # 显示排名表
     print("\n=== 最终排名 ===")
-    df = create_ranking_table(results)
     print(df.to_string(index=False))
     
     print(f"\n结果已保存到: {output_dir}")
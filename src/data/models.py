@@ -6,6 +6,7 @@
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Any
 from enum import Enum
+import copy
 import json
 
 
@@ -99,6 +100,10 @@ class AbilityEffect:
     misc: Dict[str, Any] = field(default_factory=dict)
 
 
+# AbilityEffect中有专门字段的效果键，其余归入misc
+_KNOWN_EFFECT_KEYS = frozenset({'damage', 'heal', 'buff', 'debuff', 'chance', 'mutations'})
+
+
 @dataclass
 class AbilityCost:
     """能力消耗"""
@@ -122,8 +127,7 @@ class Ability:
     def from_dict(cls, data: Dict[str, Any]) -> 'Ability':
         """从字典创建"""
         effect_data = data.get('effect', {})
-        known_effect_keys = {'damage', 'heal', 'buff', 'debuff', 'chance', 'mutations'}
-        misc_effects = {k: v for k, v in effect_data.items() if k not in known_effect_keys}
+        misc_effects = {k: v for k, v in effect_data.items() if k not in _KNOWN_EFFECT_KEYS}
         
         effect = AbilityEffect(
             damage=effect_data.get('damage', 0),
@@ -267,10 +271,12 @@ class CommanderConfig:
     special_mechanics: List[str] = field(default_factory=list)
     
     def apply_modifier(self, unit: Unit) -> Unit:
-        """应用指挥官修正到单位"""
-        # 这里可以根据指挥官特性修改单位属性
-        # 例如诺娃的单位有更高的伤害
-        modified_unit = unit  # 实际实现时应该深拷贝
+        """
+        应用指挥官修正到单位
+        
+        修正作用于单位的深拷贝，原单位不被修改，重复调用不会重复缩放
+        """
+        modified_unit = copy.deepcopy(unit)
         
         # 应用通用修正
         if 'damage' in self.modifiers:
@@ -335,4 +341,4 @@ class UnitDatabase:
             if not unit.is_flying and unit.collision_radius is None:
                 errors.append(f"{key}: 地面单位必须有碰撞半径")
                 
-        return errors
\ No newline at end of file
+        return errors
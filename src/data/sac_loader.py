@@ -3,13 +3,34 @@
 用于v2.3模型的PvE评估基准
 """
 
+import functools
+import sys
 import yaml
+import numpy as np
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Tuple, Mapping
+from dataclasses import dataclass, field
 
+from src.data.yaml_loader import (
+    DATACLASS_SLOTS, YAML_LOADER, load_cached, schema_hash, store_cached
+)
 
-@dataclass
+# 本模块构建的SAC组合对象的缓存结构哈希
+SCHEMA_HASH = schema_hash(__file__)
+
+
+def effective_hp(hp, shield, armor):
+    """
+    计算有效生命值，参数可为标量或逐单位的数组
+    
+    护甲按 armor / (armor + 10) 减伤（非正护甲不减伤），护盾直接累加（简化处理）
+    """
+    armor = np.maximum(armor, 0)
+    return hp / (1 - armor / (armor + 10)) + shield
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class SACUnit:
     """SAC中的单个单位"""
     name: str
@@ -20,42 +41,60 @@ class SACUnit:
     armor: int
     attributes: List[str]
     supply: int
+    # 有效生命值，字段不可变，构造时计算一次
+    ehp: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """预计算有效生命值"""
+        object.__setattr__(self, 'ehp', float(effective_hp(self.hp, self.shield, self.armor)))
     
     def get_ehp(self) -> float:
         """计算该单位的有效生命值"""
-        # 护甲减伤
-        if self.armor > 0:
-            armor_reduction = self.armor / (self.armor + 10)
-            effective_hp = self.hp / (1 - armor_reduction)
-        else:
-            effective_hp = self.hp
-        
-        # 护盾（简化处理）
-        return effective_hp + self.shield
+        return self.ehp
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class SACComposition:
     """标准化埃蒙部队组合"""
     name: str
     description: str
-    core_units: List[SACUnit]
+    core_units: Tuple[SACUnit, ...]
     attribute_distribution: Dict[str, float]
     ehp_per_supply: float
     threat_profile: Dict[str, Any]
     tactical_notes: List[str]
+    # 派生值，由__post_init__构建
+    _vulnerable: frozenset = field(init=False, repr=False, compare=False)
+    weighted_ehp: float = field(init=False, repr=False, compare=False)
+    # 覆盖率超过50%的主要属性
+    major_attributes: Tuple[str, ...] = field(init=False, repr=False, compare=False)
     
-    def get_weighted_ehp(self) -> float:
-        """计算加权平均EHP"""
-        total_ehp = 0
-        total_weight = 0
-        
+    def __post_init__(self):
+        """预计算加权平均EHP、主要属性和脆弱的伤害类型"""
+        # 按单位预计算的EHP加权平均，权重总和为0时记为0
+        total_ehp = 0.0
+        total_weight = 0.0
         for unit in self.core_units:
-            unit_ehp = unit.get_ehp()
-            total_ehp += unit_ehp * unit.weight
+            total_ehp += unit.ehp * unit.weight
             total_weight += unit.weight
+        object.__setattr__(self, 'weighted_ehp',
+                           total_ehp / total_weight if total_weight > 0 else 0.0)
+        
+        object.__setattr__(self, 'major_attributes', tuple(
+            attr for attr, coverage in self.attribute_distribution.items()
+            if coverage > 0.5
+        ))
         
-        return total_ehp / total_weight if total_weight > 0 else 0
+        vulnerable = set()
+        if "空中威胁" in self.threat_profile.get('primary', ''):
+            vulnerable.add("对空")
+        if any("密集" in note for note in self.tactical_notes):
+            vulnerable.add("AOE")
+        object.__setattr__(self, '_vulnerable', frozenset(vulnerable))
+    
+    def get_weighted_ehp(self) -> float:
+        """计算加权平均EHP"""
+        return self.weighted_ehp
     
     def get_attribute_coverage(self, attribute: str) -> float:
         """获取特定属性的覆盖率"""
@@ -63,36 +102,115 @@ class SACComposition:
     
     def is_vulnerable_to(self, damage_type: str) -> bool:
         """判断是否对某种伤害类型脆弱"""
-        if damage_type == "对空" and "空中威胁" in self.threat_profile.get('primary', ''):
-            return True
-        if damage_type == "AOE" and any("密集" in note for note in self.tactical_notes):
-            return True
-        return False
+        return damage_type in self._vulnerable
+
+
+class SACStore:
+    """
+    SAC核心单位的列式存储
+    
+    所有组合的核心单位数值按组合顺序拼接为一维数组，_segment记录每个单位所属的
+    组合，批量计算只需对整段数组做一次运算再按组合分段求和
+    """
+    
+    def __init__(self, compositions: Dict[str, SACComposition]):
+        self.names: List[str] = list(compositions.keys())
+        counts = np.fromiter((len(sac.core_units) for sac in compositions.values()),
+                             dtype=np.int32, count=len(self.names))
+        # 每个单位所属组合的下标
+        self._segment = np.repeat(np.arange(len(self.names)), counts)
+        
+        units = [unit for sac in compositions.values() for unit in sac.core_units]
+        self.hp = np.fromiter((u.hp for u in units), dtype=np.float64, count=len(units))
+        self.shield = np.fromiter((u.shield for u in units), dtype=np.float64, count=len(units))
+        self.armor = np.fromiter((u.armor for u in units), dtype=np.float64, count=len(units))
+        self.weight = np.fromiter((u.weight for u in units), dtype=np.float64, count=len(units))
+        self.supply = np.fromiter((u.supply for u in units), dtype=np.float64, count=len(units))
+        self.ehp_per_supply = np.fromiter((sac.ehp_per_supply for sac in compositions.values()),
+                                          dtype=np.float64, count=len(self.names))
+        
+        # 全局属性下标及各组合的属性覆盖率矩阵（组合数 × 属性数）
+        self.row_index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.attr_index: Dict[str, int] = {}
+        for sac in compositions.values():
+            for attr in sac.attribute_distribution:
+                self.attr_index.setdefault(attr, len(self.attr_index))
+        self.coverage = np.zeros((len(self.names), len(self.attr_index)), dtype=np.float64)
+        for row, sac in enumerate(compositions.values()):
+            for attr, coverage in sac.attribute_distribution.items():
+                self.coverage[row, self.attr_index[attr]] = coverage
+    
+    def bonus_to_vec(self, bonus_damage: Dict[str, float]) -> np.ndarray:
+        """将属性加成伤害字典转换为按attr_index排列的向量，未出现在任何组合中的属性忽略"""
+        vec = np.zeros(len(self.attr_index), dtype=np.float64)
+        for attr, bonus in bonus_damage.items():
+            col = self.attr_index.get(attr)
+            if col is not None:
+                vec[col] = bonus
+        return vec
+    
+    def _segment_sum(self, values: np.ndarray) -> np.ndarray:
+        """按组合对单位数值求和"""
+        sums = np.bincount(self._segment, weights=values, minlength=len(self.names))
+        # 没有任何单位时bincount返回int64，统一为float64
+        return sums.astype(np.float64, copy=False)
+    
+    def total_weight(self) -> np.ndarray:
+        """各组合的权重总和"""
+        return self._segment_sum(self.weight)
+    
+    def weighted_supply(self) -> np.ndarray:
+        """各组合按权重加权的人口总和"""
+        return self._segment_sum(self.supply * self.weight)
+    
+    def weighted_ehp(self) -> np.ndarray:
+        """各组合的加权平均EHP，权重总和为0的组合记为0"""
+        ehp = effective_hp(self.hp, self.shield, self.armor)
+        total_weight = self.total_weight()
+        total_ehp = self._segment_sum(ehp * self.weight)
+        return np.divide(total_ehp, total_weight,
+                         out=np.zeros_like(total_ehp), where=total_weight > 0)
 
 
 class SACLoader:
     """SAC数据加载器"""
     
-    def __init__(self, config_path: Optional[Path] = None):
+    def __init__(self, config_path: Optional[Path] = None, use_cache: bool = True,
+                 cache_dir: Optional[Path] = None):
         """
         初始化SAC加载器
         
         Args:
             config_path: SAC配置文件路径，默认使用项目内置路径
+            use_cache: 是否使用pickle缓存跳过未修改配置的YAML解析
+            cache_dir: 缓存目录，默认见yaml_loader.default_cache_dir
         """
         if config_path is None:
             config_path = Path(__file__).parent / "standard_amon_compositions.yaml"
         
         self.config_path = config_path
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
         self._compositions: Dict[str, SACComposition] = {}
         self._evaluation_settings: Dict[str, Any] = {}
         self._load_config()
+        self._store = SACStore(self._compositions)
+        # 只读视图，对外共享底层数据而不复制
+        self._compositions_view = MappingProxyType(self._compositions)
+        self._evaluation_settings_view = MappingProxyType(self._evaluation_settings)
     
     def _load_config(self):
         """加载SAC配置文件"""
+        if self.use_cache:
+            cached = load_cached(self.config_path, SCHEMA_HASH, self.cache_dir)
+            if cached is not None:
+                self._compositions, self._evaluation_settings = cached
+                return
+        
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            # 以二进制读取，由libyaml在C层完成UTF-8解码
+            with open(self.config_path, 'rb') as f:
+                config = yaml.load(f, Loader=YAML_LOADER)
             
             # 解析SAC组合
             compositions_data = config.get('compositions', {})
@@ -106,6 +224,10 @@ class SACLoader:
             raise FileNotFoundError(f"SAC配置文件未找到: {self.config_path}")
         except yaml.YAMLError as e:
             raise ValueError(f"SAC配置文件格式错误: {e}")
+        
+        if self.use_cache:
+            store_cached(self.config_path, (self._compositions, self._evaluation_settings),
+                         SCHEMA_HASH, self.cache_dir)
     
     def _parse_composition(self, sac_data: Dict[str, Any]) -> SACComposition:
         """解析单个SAC组合数据"""
@@ -119,7 +241,7 @@ class SACLoader:
                 hp=unit_data['hp'],
                 shield=unit_data['shield'],
                 armor=unit_data['armor'],
-                attributes=unit_data['attributes'],
+                attributes=[sys.intern(attr) for attr in unit_data['attributes']],
                 supply=unit_data['supply']
             )
             core_units.append(unit)
@@ -127,8 +249,11 @@ class SACLoader:
         return SACComposition(
             name=sac_data['name'],
             description=sac_data['description'],
-            core_units=core_units,
-            attribute_distribution=sac_data['attribute_distribution'],
+            core_units=tuple(core_units),
+            attribute_distribution={
+                sys.intern(attr): coverage
+                for attr, coverage in sac_data['attribute_distribution'].items()
+            },
             ehp_per_supply=sac_data['ehp_per_supply'],
             threat_profile=sac_data['threat_profile'],
             tactical_notes=sac_data['tactical_notes']
@@ -144,13 +269,17 @@ class SACLoader:
         """列出所有可用的SAC组合ID"""
         return list(self._compositions.keys())
     
-    def get_all_compositions(self) -> Dict[str, SACComposition]:
-        """获取所有SAC组合"""
-        return self._compositions.copy()
+    def get_all_compositions(self) -> Mapping[str, SACComposition]:
+        """获取所有SAC组合（只读视图，需要修改时请先dict()复制）"""
+        return self._compositions_view
+    
+    def get_all_weighted_ehp(self) -> Dict[str, float]:
+        """批量计算所有SAC组合的加权平均EHP"""
+        return dict(zip(self._store.names, self._store.weighted_ehp().tolist()))
     
-    def get_evaluation_settings(self) -> Dict[str, Any]:
-        """获取评估设置"""
-        return self._evaluation_settings.copy()
+    def get_evaluation_settings(self) -> Mapping[str, Any]:
+        """获取评估设置（只读视图，需要修改时请先dict()复制）"""
+        return self._evaluation_settings_view
     
     def calculate_mixed_damage_multiplier(self, sac_id: str, bonus_damage: Dict[str, float]) -> float:
         """
@@ -163,16 +292,33 @@ class SACLoader:
         Returns:
             混合伤害乘数
         """
-        sac = self.get_composition(sac_id)
-        total_multiplier = 1.0
+        self.get_composition(sac_id)
+        multipliers = self.calculate_mixed_damage_multiplier_vec(
+            [sac_id], self.bonus_to_vec(bonus_damage)
+        )
+        return float(multipliers[0])
+    
+    def bonus_to_vec(self, bonus_damage: Dict[str, float]) -> np.ndarray:
+        """将属性加成伤害字典转换为calculate_mixed_damage_multiplier_vec使用的向量"""
+        return self._store.bonus_to_vec(bonus_damage)
+    
+    def calculate_mixed_damage_multiplier_vec(self, sac_ids: List[str],
+                                              bonus_matrix: np.ndarray) -> np.ndarray:
+        """
+        批量计算对多个SAC的混合伤害乘数
         
-        for attribute, bonus in bonus_damage.items():
-            coverage = sac.get_attribute_coverage(attribute)
-            if coverage > 0:
-                # 加成伤害按覆盖率加权
-                total_multiplier += (bonus / 100) * coverage
+        Args:
+            sac_ids: SAC组合ID列表
+            bonus_matrix: bonus_to_vec构建的属性加成向量 (属性数,)，
+                          或由多个向量堆叠成的矩阵 (加成方案数, 属性数)
         
-        return total_multiplier
+        Returns:
+            形状为 (..., len(sac_ids)) 的混合伤害乘数
+        """
+        rows = [self._store.row_index[sac_id] for sac_id in sac_ids]
+        # 加成伤害按覆盖率加权，非正覆盖率不产生加成
+        coverage = np.maximum(self._store.coverage[rows], 0.0)
+        return 1.0 + (bonus_matrix @ coverage.T) / 100
     
     def get_counter_recommendations(self, sac_id: str) -> Dict[str, List[str]]:
         """获取对抗特定SAC的推荐策略"""
@@ -181,32 +327,40 @@ class SACLoader:
         return {
             'countered_by': sac.threat_profile.get('countered_by', []),
             'tactical_notes': sac.tactical_notes,
-            'vulnerable_attributes': [
-                attr for attr, coverage in sac.attribute_distribution.items()
-                if coverage > 0.5  # 超过50%覆盖率的属性
-            ]
+            'vulnerable_attributes': list(sac.major_attributes)
         }
     
     def validate_config(self) -> List[str]:
         """验证配置文件的完整性"""
         errors = []
         
-        for sac_id, sac in self._compositions.items():
+        store = self._store
+        total_weights = store.total_weight()
+        weighted_supply = store.weighted_supply()
+        # 人口为0的组合记为inf，按差异过大报告
+        calculated_ehp = np.divide(store.weighted_ehp(), weighted_supply,
+                                   out=np.full_like(weighted_supply, np.inf),
+                                   where=weighted_supply > 0)
+        bad_weight = np.abs(total_weights - 1.0) > 0.01
+        # 取反的区间判断同时捕获NaN；组合未配置的属性在矩阵中为0，不会被误报
+        bad_coverage = ~((store.coverage >= 0) & (store.coverage <= 1)).all(axis=1)
+        bad_ehp = np.abs(calculated_ehp - store.ehp_per_supply) > 10
+        
+        # 只为存在问题的组合生成错误信息
+        for i in np.flatnonzero(bad_weight | bad_coverage | bad_ehp):
+            sac_id = store.names[i]
             # 检查权重总和
-            total_weight = sum(unit.weight for unit in sac.core_units)
-            if abs(total_weight - 1.0) > 0.01:
-                errors.append(f"{sac_id}: 单位权重总和不等于1.0 ({total_weight})")
+            if bad_weight[i]:
+                errors.append(f"{sac_id}: 单位权重总和不等于1.0 ({total_weights[i]})")
             
             # 检查属性分布
-            for attr, coverage in sac.attribute_distribution.items():
-                if not 0 <= coverage <= 1:
-                    errors.append(f"{sac_id}: 属性'{attr}'覆盖率超出范围 ({coverage})")
+            if bad_coverage[i]:
+                for attr, coverage in self._compositions[sac_id].attribute_distribution.items():
+                    if not 0 <= coverage <= 1:
+                        errors.append(f"{sac_id}: 属性'{attr}'覆盖率超出范围 ({coverage})")
             
             # 检查EHP合理性
-            calculated_ehp = sac.get_weighted_ehp() / (
-                sum(unit.supply * unit.weight for unit in sac.core_units)
-            )
-            if abs(calculated_ehp - sac.ehp_per_supply) > 10:
+            if bad_ehp[i]:
                 errors.append(f"{sac_id}: 计算EHP与配置EHP差异过大")
         
         return errors
@@ -225,24 +379,17 @@ class SACLoader:
                 'unit_count': len(sac.core_units),
                 'ehp_per_supply': sac.ehp_per_supply,
                 'primary_threat': sac.threat_profile.get('primary'),
-                'main_attributes': [
-                    attr for attr, coverage in sac.attribute_distribution.items()
-                    if coverage > 0.5
-                ]
+                'main_attributes': list(sac.major_attributes)
             }
         
         return summary
 
 
 # 全局SAC加载器实例
-_sac_loader = None
-
+@functools.cache
 def get_sac_loader() -> SACLoader:
     """获取全局SAC加载器实例（单例模式）"""
-    global _sac_loader
-    if _sac_loader is None:
-        _sac_loader = SACLoader()
-    return _sac_loader
+    return SACLoader()
 
 
 def load_sac_composition(sac_id: str) -> SACComposition:
@@ -4,9 +4,15 @@ YAML数据加载器 - v2.4
 """
 import yaml
 import os
+import re
+import sys
+from operator import itemgetter
+import hashlib
+import pickle
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 # 设置日志
@@ -15,8 +21,168 @@ logger = logging.getLogger(__name__)
 # 数据根目录
 DATA_ROOT = Path(__file__).parent.parent.parent / "data"
 
+# 优先使用libyaml的C实现，不可用时回退到纯Python实现
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-@dataclass
+# 数据类的slots参数需要Python 3.10+，更低版本回退为普通数据类
+DATACLASS_SLOTS: Dict[str, bool] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# 并行解析YAML文件的最大线程数
+MAX_PARSE_WORKERS = 32
+
+# 文件头中用于识别数据ID的行数
+HEADER_LINES = 32
+
+# 顶层对象下的 id 字段（单位/指挥官文件）
+_HEADER_ID_RE = re.compile(r'^\s+id:\s*["\']?([^"\'\s#]+)')
+# 列表项的 id 字段（武器文件）
+_ITEM_ID_RE = re.compile(r'^(\s*)-\s+id:\s*["\']?([^"\'\s#]+)')
+
+# 解析结果缓存目录的环境变量，未设置时使用用户缓存目录（XDG_CACHE_HOME或~/.cache）
+CACHE_DIR_ENV = "SC2_CEV_CACHE_DIR"
+
+
+def _read_yaml_bytes(file_path: Path) -> Tuple[Optional[bytes], Optional[Exception]]:
+    """读取单个YAML文件的原始字节（由libyaml在C层解码），返回 (字节, 异常)"""
+    try:
+        return file_path.read_bytes(), None
+    except Exception as e:
+        return None, e
+
+
+def _parse_yaml_bytes(content: bytes) -> Tuple[Any, Optional[Exception]]:
+    """解析单个YAML文档字节，返回 (数据, 异常)"""
+    try:
+        return yaml.load(content, Loader=YAML_LOADER), None
+    except Exception as e:
+        return None, e
+
+
+def _load_yaml_file(file_path: Path) -> Tuple[Any, Optional[Exception]]:
+    """读取并解析单个YAML文件，返回 (数据, 异常)"""
+    content, error = _read_yaml_bytes(file_path)
+    if error is not None:
+        return None, error
+    return _parse_yaml_bytes(content)
+
+
+def _peek_ids(file_path: Path, multiple: bool = False) -> List[str]:
+    """
+    不解析YAML，仅按行扫描获取文件中数据对象的ID
+    
+    Args:
+        file_path: YAML文件路径
+        multiple: False时只读文件头（HEADER_LINES行）取顶层对象的id；
+                  True时扫描全文，取与首个列表项同缩进的所有 "- id:"（武器文件）
+    """
+    ids: List[str] = []
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if not multiple:
+                for _, line in zip(range(HEADER_LINES), f):
+                    match = _HEADER_ID_RE.match(line)
+                    if match:
+                        return [match.group(1)]
+                return ids
+            
+            indent = None
+            for line in f:
+                match = _ITEM_ID_RE.match(line)
+                if match and (indent is None or match.group(1) == indent):
+                    indent = match.group(1)
+                    ids.append(match.group(2))
+    except OSError:
+        pass
+    return ids
+
+
+def default_cache_dir() -> Path:
+    """默认的解析结果缓存目录（独立于数据目录，可通过环境变量配置）"""
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured:
+        return Path(configured)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "sc2-cev"
+
+
+def schema_hash(*module_files: str) -> str:
+    """
+    根据构建缓存对象的模块源码生成结构哈希
+    
+    模块代码（数据类定义、构建逻辑）或Python版本变化后哈希随之改变，旧缓存自动失效
+    """
+    digest = hashlib.blake2b(repr(sys.version_info[:2]).encode(), digest_size=16)
+    for module_file in module_files:
+        digest.update(Path(module_file).read_bytes())
+    return digest.hexdigest()
+
+
+# 本模块构建的数据对象的缓存结构哈希
+SCHEMA_HASH = schema_hash(__file__)
+
+
+def cache_path_for(file_path: Path, cache_dir: Optional[Path] = None) -> Path:
+    """源文件对应的pickle缓存路径（缓存目录下以源文件绝对路径的哈希命名）"""
+    name = hashlib.blake2b(os.fsencode(Path(file_path).resolve()), digest_size=16).hexdigest()
+    return Path(cache_dir or default_cache_dir()) / f"{name}.pkl"
+
+
+def load_cached(file_path: Path, schema: str = SCHEMA_HASH,
+                cache_dir: Optional[Path] = None) -> Optional[Any]:
+    """
+    读取源文件的pickle缓存
+    
+    缓存中记录了结构哈希及源文件的路径、修改时间和大小，任一不一致即视为过期；
+    缓存缺失、过期或无法反序列化时返回None
+    """
+    cache_path = cache_path_for(file_path, cache_dir)
+    try:
+        stat = file_path.stat()
+        with open(cache_path, 'rb') as f:
+            key, obj = pickle.load(f)
+    except Exception:
+        return None
+    if key != (schema, str(Path(file_path).resolve()), stat.st_mtime_ns, stat.st_size):
+        return None
+    return obj
+
+
+def store_cached(file_path: Path, obj: Any, schema: str = SCHEMA_HASH,
+                 cache_dir: Optional[Path] = None) -> None:
+    """将解析结果写入源文件的pickle缓存，写入失败时忽略"""
+    cache_path = cache_path_for(file_path, cache_dir)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        stat = file_path.stat()
+        key = (schema, str(Path(file_path).resolve()), stat.st_mtime_ns, stat.st_size)
+        # 缓存目录仅当前用户可访问
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((key, obj), f, protocol=5)
+        # 先写临时文件再替换，避免并发读取到写了一半的缓存
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        logger.debug(f"写入缓存失败 {file_path}: {e}")
+
+
+# from_dict中各子字典的标量字段及默认值；与默认值合并后用一次itemgetter取出全部字段
+_WEAPON_STATS_DEFAULTS = {'damage': 0, 'damage_type': 'Normal', 'attacks': 1, 'period': 1.0, 'range': 0}
+_WEAPON_PROPERTIES_DEFAULTS = {'splash_radius': 0.0, 'arc': 0.0}
+_UNIT_STATS_DEFAULTS = {'life': 0, 'armor': 0, 'shields': 0, 'energy': 0}
+_UNIT_COST_DEFAULTS = {'minerals': 0, 'vespene': 0, 'supply': 0, 'build_time': 0}
+_UNIT_MOVEMENT_DEFAULTS = {'speed': 0, 'acceleration': 0, 'turning_rate': 0}
+_UNIT_PHYSICS_DEFAULTS = {'radius': 0, 'sight': 0, 'height': 0}
+
+_GET_WEAPON_STATS = itemgetter(*_WEAPON_STATS_DEFAULTS)
+_GET_WEAPON_PROPERTIES = itemgetter(*_WEAPON_PROPERTIES_DEFAULTS)
+_GET_UNIT_STATS = itemgetter(*_UNIT_STATS_DEFAULTS)
+_GET_UNIT_COST = itemgetter(*_UNIT_COST_DEFAULTS)
+_GET_UNIT_MOVEMENT = itemgetter(*_UNIT_MOVEMENT_DEFAULTS)
+_GET_UNIT_PHYSICS = itemgetter(*_UNIT_PHYSICS_DEFAULTS)
+
+
+@dataclass(**DATACLASS_SLOTS)
 class WeaponData:
     """武器数据结构"""
     id: str
@@ -38,8 +204,11 @@ class WeaponData:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'WeaponData':
         """从字典创建武器数据"""
-        stats = data.get('stats', {})
         properties = data.get('properties', {})
+        damage, damage_type, attacks, period, weapon_range = _GET_WEAPON_STATS(
+            {**_WEAPON_STATS_DEFAULTS, **data.get('stats', {})}
+        )
+        splash_radius, arc = _GET_WEAPON_PROPERTIES({**_WEAPON_PROPERTIES_DEFAULTS, **properties})
         
         return cls(
             id=data['id'],
@@ -47,20 +216,23 @@ class WeaponData:
             name_en=data['name_en'],
             target_filters=data.get('target_filters', []),
             exclude_filters=data.get('exclude_filters', []),
-            damage=stats.get('damage', 0),
-            damage_type=stats.get('damage_type', 'Normal'),
-            attacks=stats.get('attacks', 1),
-            period=stats.get('period', 1.0),
-            range=stats.get('range', 0),
-            splash_radius=properties.get('splash_radius', 0.0),
+            damage=damage,
+            damage_type=damage_type,
+            attacks=attacks,
+            period=period,
+            range=weapon_range,
+            splash_radius=splash_radius,
             splash_damage=properties.get('splash_damage', []),
-            arc=properties.get('arc', 0.0),
-            attribute_bonus=data.get('attribute_bonus', {}),
+            arc=arc,
+            attribute_bonus={
+                sys.intern(attr): bonus
+                for attr, bonus in data.get('attribute_bonus', {}).items()
+            },
             upgrades=data.get('upgrades', {})
         )
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class UnitData:
     """单位数据结构"""
     id: str
@@ -100,10 +272,18 @@ class UnitData:
     def from_dict(cls, data: Dict[str, Any]) -> 'UnitData':
         """从字典创建单位数据"""
         unit = data['unit']
-        stats = unit.get('stats', {})
-        cost = unit.get('cost', {})
-        movement = unit.get('movement', {})
-        physics = unit.get('physics', {})
+        life, armor, shields, energy = _GET_UNIT_STATS(
+            {**_UNIT_STATS_DEFAULTS, **unit.get('stats', {})}
+        )
+        minerals, vespene, supply, build_time = _GET_UNIT_COST(
+            {**_UNIT_COST_DEFAULTS, **unit.get('cost', {})}
+        )
+        speed, acceleration, turning_rate = _GET_UNIT_MOVEMENT(
+            {**_UNIT_MOVEMENT_DEFAULTS, **unit.get('movement', {})}
+        )
+        radius, sight, height = _GET_UNIT_PHYSICS(
+            {**_UNIT_PHYSICS_DEFAULTS, **unit.get('physics', {})}
+        )
         
         return cls(
             id=unit['id'],
@@ -112,26 +292,26 @@ class UnitData:
             commander=unit['commander'],
             race=unit['race'],
             # 基础属性
-            life=stats.get('life', 0),
-            armor=stats.get('armor', 0),
-            shields=stats.get('shields', 0),
-            energy=stats.get('energy', 0),
+            life=life,
+            armor=armor,
+            shields=shields,
+            energy=energy,
             # 成本
-            minerals=cost.get('minerals', 0),
-            vespene=cost.get('vespene', 0),
-            supply=cost.get('supply', 0),
-            build_time=cost.get('build_time', 0),
+            minerals=minerals,
+            vespene=vespene,
+            supply=supply,
+            build_time=build_time,
             # 移动
-            speed=movement.get('speed', 0),
-            acceleration=movement.get('acceleration', 0),
-            turning_rate=movement.get('turning_rate', 0),
+            speed=speed,
+            acceleration=acceleration,
+            turning_rate=turning_rate,
             # 物理
-            radius=physics.get('radius', 0),
-            sight=physics.get('sight', 0),
-            height=physics.get('height', 0),
+            radius=radius,
+            sight=sight,
+            height=height,
             # 类型
             plane=unit.get('plane', 'Ground'),
-            attributes=unit.get('attributes', []),
+            attributes=[sys.intern(attr) for attr in unit.get('attributes', [])],
             # 武器
             weapons=unit.get('weapons', []),
             # 能力
@@ -141,7 +321,7 @@ class UnitData:
         )
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class CommanderData:
     """指挥官数据结构"""
     id: str
@@ -175,14 +355,35 @@ class CommanderData:
 
 
 class YAMLDataLoader:
-    """YAML数据加载器主类"""
+    """
+    YAML数据加载器主类
+    
+    get_unit/get_weapon/get_commander按需加载：只解析到找到目标数据为止，
+    已加载的数据缓存在units/weapons/commanders中；load_*/load_all加载全部剩余文件
+    """
     
-    def __init__(self, data_root: Optional[Path] = None):
-        """初始化数据加载器"""
+    def __init__(self, data_root: Optional[Path] = None, use_cache: bool = True,
+                 cache_dir: Optional[Path] = None):
+        """
+        初始化数据加载器
+        
+        Args:
+            data_root: 数据根目录，默认使用项目内置路径
+            use_cache: 是否使用pickle缓存跳过未修改文件的YAML解析
+            cache_dir: 缓存目录，默认见default_cache_dir
+        """
         self.data_root = data_root or DATA_ROOT
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
         self.units: Dict[str, UnitData] = {}
         self.weapons: Dict[str, WeaponData] = {}
         self.commanders: Dict[str, CommanderData] = {}
+        # 各数据子目录中尚未加载的文件，首次访问时扫描
+        self._pending: Dict[str, List[Path]] = {}
+        # 各数据子目录的 数据ID -> 文件 索引，由文件头构建
+        self._id_index: Dict[str, Dict[str, Path]] = {}
+        # 各数据子目录中文件头里识别不出ID的文件，按需加载未命中时才回退到这些文件
+        self._unindexed: Dict[str, List[Path]] = {}
         
         # 确保数据目录存在
         if not self.data_root.exists():
@@ -194,23 +395,163 @@ class YAMLDataLoader:
         self.load_weapons()
         self.load_units()
         
+    def _parse_files(self, paths: List[Path]) -> List[Tuple[Any, Optional[Exception]]]:
+        """
+        解析一组YAML文件
+        
+        每个文件单独读取并解析（不拼接文件，避免块标量等在文件边界处的值被改变），
+        多个文件时并行处理
+        
+        Returns:
+            与paths顺序一致的 (解析结果, 异常) 列表
+        """
+        if not paths:
+            return []
+        if len(paths) == 1:
+            return [_load_yaml_file(paths[0])]
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_PARSE_WORKERS, len(paths))) as executor:
+            return list(executor.map(_load_yaml_file, paths))
+    
+    def _load_files(self, paths: List[Path],
+                    build: Callable[[Any], Any]) -> List[Tuple[Path, Any, Optional[Exception]]]:
+        """
+        加载一组YAML文件并构建数据对象
+        
+        未修改文件直接从pickle缓存读取构建结果，其余文件解析后由build构建并写回缓存
+        
+        Returns:
+            与paths顺序一致的 (文件路径, 构建结果, 异常) 列表
+        """
+        results: Dict[Path, Tuple[Any, Optional[Exception]]] = {}
+        
+        stale = []
+        for path in paths:
+            cached = load_cached(path, cache_dir=self.cache_dir) if self.use_cache else None
+            if cached is not None:
+                results[path] = (cached, None)
+            else:
+                stale.append(path)
+        
+        for path, (data, error) in zip(stale, self._parse_files(stale)):
+            obj = None
+            if error is None:
+                try:
+                    obj = build(data)
+                except Exception as e:
+                    error = e
+                else:
+                    if self.use_cache:
+                        store_cached(path, obj, cache_dir=self.cache_dir)
+            results[path] = (obj, error)
+        
+        return [(path, *results[path]) for path in paths]
+    
+    def _pending_paths(self, kind: str) -> List[Path]:
+        """获取数据子目录中尚未加载的文件列表（可原地修改）"""
+        if kind not in self._pending:
+            directory = self.data_root / kind
+            self._pending[kind] = sorted(directory.glob("*.yaml")) if directory.exists() else []
+        return self._pending[kind]
+    
+    def _take_pending(self, kind: str) -> List[Path]:
+        """取出数据子目录中全部尚未加载的文件"""
+        paths = self._pending_paths(kind)
+        self._pending[kind] = []
+        return paths
+    
+    def _get_id_index(self, kind: str) -> Dict[str, Path]:
+        """获取数据子目录的ID索引，首次访问时扫描尚未加载文件的文件头"""
+        if kind not in self._id_index:
+            index: Dict[str, Path] = {}
+            unindexed: List[Path] = []
+            for path in self._pending_paths(kind):
+                item_ids = _peek_ids(path, multiple=(kind == "weapons"))
+                if not item_ids:
+                    unindexed.append(path)
+                for item_id in item_ids:
+                    index.setdefault(item_id, path)
+            self._id_index[kind] = index
+            self._unindexed[kind] = unindexed
+        return self._id_index[kind]
+    
+    def _lazy_get(self, item_id: str, loaded: Dict[str, Any], kind: str,
+                  ingest: Callable[[List[Path]], None]) -> Optional[Any]:
+        """
+        按需加载目标数据
+        
+        先按文件头索引直接加载对应文件；仍未找到时只回退到文件头中识别不出ID的
+        剩余文件，一次性批量加载
+        """
+        if item_id in loaded:
+            return loaded[item_id]
+        
+        pending = self._pending_paths(kind)
+        path = self._get_id_index(kind).get(item_id)
+        if path is not None and path in pending:
+            pending.remove(path)
+            ingest([path])
+        
+        if item_id not in loaded:
+            remaining = set(pending)
+            fallback = [path for path in self._unindexed[kind] if path in remaining]
+            if fallback:
+                skip = set(fallback)
+                self._pending[kind] = [path for path in pending if path not in skip]
+                ingest(fallback)
+        return loaded.get(item_id)
+    
+    def _ingest_units(self, paths: List[Path]) -> None:
+        """加载单位数据文件"""
+        loaded_ids = []
+        for file_path, unit, error in self._load_files(paths, UnitData.from_dict):
+            if error is not None:
+                logger.error(f"加载单位数据失败 {file_path}: {error}")
+                continue
+            self.units[unit.id] = unit
+            loaded_ids.append(unit.id)
+        
+        if loaded_ids and logger.isEnabledFor(logging.INFO):
+            logger.info(f"加载单位数据 {len(loaded_ids)} 个: {', '.join(loaded_ids)}")
+    
+    def _ingest_weapons(self, paths: List[Path]) -> None:
+        """加载武器数据文件"""
+        def build_weapons(data: Dict[str, Any]) -> List[WeaponData]:
+            return [WeaponData.from_dict(weapon_data) for weapon_data in data.get('weapons', [])]
+        
+        loaded_ids = []
+        for file_path, weapons, error in self._load_files(paths, build_weapons):
+            if error is not None:
+                logger.error(f"加载武器数据失败 {file_path}: {error}")
+                continue
+            for weapon in weapons:
+                self.weapons[weapon.id] = weapon
+                loaded_ids.append(weapon.id)
+        
+        if loaded_ids and logger.isEnabledFor(logging.INFO):
+            logger.info(f"加载武器数据 {len(loaded_ids)} 个: {', '.join(loaded_ids)}")
+    
+    def _ingest_commanders(self, paths: List[Path]) -> None:
+        """加载指挥官数据文件"""
+        loaded_ids = []
+        for file_path, commander, error in self._load_files(paths, CommanderData.from_dict):
+            if error is not None:
+                logger.error(f"加载指挥官数据失败 {file_path}: {error}")
+                continue
+            self.commanders[commander.id] = commander
+            loaded_ids.append(commander.id)
+        
+        if loaded_ids and logger.isEnabledFor(logging.INFO):
+            logger.info(f"加载指挥官数据 {len(loaded_ids)} 个: {', '.join(loaded_ids)}")
+        
     def load_units(self) -> Dict[str, UnitData]:
         """加载所有单位数据"""
         units_dir = self.data_root / "units"
         if not units_dir.exists():
             logger.warning(f"单位数据目录不存在: {units_dir}")
             return self.units
-            
-        for file_path in units_dir.glob("*.yaml"):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
-                    unit = UnitData.from_dict(data)
-                    self.units[unit.id] = unit
-                    logger.info(f"加载单位数据: {unit.name} ({unit.id})")
-            except Exception as e:
-                logger.error(f"加载单位数据失败 {file_path}: {e}")
-                
+        
+        self._ingest_units(self._take_pending("units"))
         return self.units
         
     def load_weapons(self) -> Dict[str, WeaponData]:
@@ -219,18 +560,8 @@ class YAMLDataLoader:
         if not weapons_dir.exists():
             logger.warning(f"武器数据目录不存在: {weapons_dir}")
             return self.weapons
-            
-        for file_path in weapons_dir.glob("*.yaml"):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
-                    for weapon_data in data.get('weapons', []):
-                        weapon = WeaponData.from_dict(weapon_data)
-                        self.weapons[weapon.id] = weapon
-                        logger.info(f"加载武器数据: {weapon.name} ({weapon.id})")
-            except Exception as e:
-                logger.error(f"加载武器数据失败 {file_path}: {e}")
-                
+        
+        self._ingest_weapons(self._take_pending("weapons"))
         return self.weapons
         
     def load_commanders(self) -> Dict[str, CommanderData]:
@@ -239,33 +570,25 @@ class YAMLDataLoader:
         if not commanders_dir.exists():
             logger.warning(f"指挥官数据目录不存在: {commanders_dir}")
             return self.commanders
-            
-        for file_path in commanders_dir.glob("*.yaml"):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
-                    commander = CommanderData.from_dict(data)
-                    self.commanders[commander.id] = commander
-                    logger.info(f"加载指挥官数据: {commander.name} ({commander.id})")
-            except Exception as e:
-                logger.error(f"加载指挥官数据失败 {file_path}: {e}")
-                
+        
+        self._ingest_commanders(self._take_pending("commanders"))
         return self.commanders
         
     def get_unit(self, unit_id: str) -> Optional[UnitData]:
-        """获取单位数据"""
-        return self.units.get(unit_id)
+        """获取单位数据（未加载时按需加载）"""
+        return self._lazy_get(unit_id, self.units, "units", self._ingest_units)
         
     def get_weapon(self, weapon_id: str) -> Optional[WeaponData]:
-        """获取武器数据"""
-        return self.weapons.get(weapon_id)
+        """获取武器数据（未加载时按需加载）"""
+        return self._lazy_get(weapon_id, self.weapons, "weapons", self._ingest_weapons)
         
     def get_commander(self, commander_id: str) -> Optional[CommanderData]:
-        """获取指挥官数据"""
-        return self.commanders.get(commander_id)
+        """获取指挥官数据（未加载时按需加载）"""
+        return self._lazy_get(commander_id, self.commanders, "commanders", self._ingest_commanders)
         
     def validate_references(self) -> List[str]:
-        """验证数据引用完整性"""
+        """验证数据引用完整性（需要全部数据，会先加载剩余文件）"""
+        self.load_all()
         errors = []
         
         # 验证单位的武器引用
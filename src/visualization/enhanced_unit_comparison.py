@@ -121,9 +121,9 @@ class EnhancedUnitVisualizer:
                   c=[self.colors[cmd] for cmd in units['commander']],
                   alpha=0.7, edgecolors='black')
         
-        for _, unit in units.iterrows():
-            ax.annotate(unit['unit_name'], 
-                       (unit['effective_cost'], unit['overall_score']),
+        for name, cost, score in zip(units['unit_name'], units['effective_cost'], units['overall_score']):
+            ax.annotate(name, 
+                       (cost, score),
                        xytext=(5, 5), textcoords='offset points', fontsize=10)
         
         ax.set_title('成本效益散点图', fontsize=14)
@@ -151,25 +151,21 @@ class EnhancedUnitVisualizer:
         def normalize(series):
             return (series - series.min()) / (series.max() - series.min())
         
-        # 准备雷达图数据
-        for _, unit in units.iterrows():
-            values = [
-                normalize(units['cev'])[unit.name],
-                normalize(units['effective_dps'])[unit.name],
-                normalize(units['survivability'])[unit.name],
-                normalize(units['mobility_score'])[unit.name],
-                normalize(units['range_score'])[unit.name],
-                normalize(units['versatility_score'])[unit.name]
-            ]
+        # 准备雷达图数据，各维度整列只标准化一次
+        dimensions = ['cev', 'effective_dps', 'survivability',
+                      'mobility_score', 'range_score', 'versatility_score']
+        normalized = normalize(units[dimensions]).to_numpy().tolist()
+        
+        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
+        angles += angles[:1]
+        
+        for values, unit_name, commander in zip(normalized, units['unit_name'], units['commander']):
             values += values[:1]  # 闭合图形
             
-            angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-            angles += angles[:1]
-            
             ax.plot(angles, values, 'o-', linewidth=2, 
-                   label=f"{unit['unit_name']}({unit['commander']})",
-                   color=self.colors[unit['commander']])
-            ax.fill(angles, values, alpha=0.15, color=self.colors[unit['commander']])
+                   label=f"{unit_name}({commander})",
+                   color=self.colors[commander])
+            ax.fill(angles, values, alpha=0.15, color=self.colors[commander])
         
         ax.set_xticks(angles[:-1])
         ax.set_xticklabels(categories, size=12)
@@ -195,17 +191,16 @@ class EnhancedUnitVisualizer:
         data_matrix = []
         unit_labels = []
         
+        # 按全表范围一次性标准化到0-1范围
+        col_data = self.df[metrics]
+        normalized = (col_data - col_data.min()) / (col_data.max() - col_data.min())
+        
         for phase in phases:
-            phase_data = self.df[self.df['game_phase'] == phase]
-            for _, unit in phase_data.iterrows():
-                row = []
-                for metric in metrics:
-                    # 标准化到0-1范围
-                    col_data = self.df[metric]
-                    normalized = (unit[metric] - col_data.min()) / (col_data.max() - col_data.min())
-                    row.append(normalized)
-                data_matrix.append(row)
-                unit_labels.append(f"{unit['unit_name']}\n{phase.replace('_', ' ').title()}")
+            phase_mask = self.df['game_phase'] == phase
+            phase_title = phase.replace('_', ' ').title()
+            data_matrix.extend(normalized.loc[phase_mask].to_numpy().tolist())
+            unit_labels.extend(f"{unit_name}\n{phase_title}"
+                               for unit_name in self.df.loc[phase_mask, 'unit_name'])
         
         # 创建热力图
         fig, ax = plt.subplots(figsize=(12, 10))
@@ -293,13 +288,12 @@ class EnhancedUnitVisualizer:
             
             # 添加单位名称
             ax.set_yticks(y_pos)
-            ax.set_yticklabels([f"{row['unit_name']}({row['commander']})" 
-                               for _, row in phase_data.iterrows()])
+            ax.set_yticklabels((phase_data['unit_name'] + '(' + phase_data['commander'] + ')').tolist())
             
             # 添加数值标签
-            for i, (_, row) in enumerate(phase_data.iterrows()):
-                ax.text(row['overall_score'] + 0.1, i, 
-                       f"{row['overall_score']:.2f}", 
+            for i, score in enumerate(phase_data['overall_score']):
+                ax.text(score + 0.1, i, 
+                       f"{score:.2f}", 
                        va='center', fontsize=10)
             
             ax.set_xlabel('综合评分', fontsize=12)
@@ -0,0 +1,133 @@
+"""
+合作任务数据导入脚本测试
+"""
+
+import csv
+import sqlite3
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "tools" / "data_maintenance"))
+
+import import_coop_data
+
+CSV_FIELDS = [
+    'english_id', 'chinese_name', 'base_unit', 'commander',
+    'mineral_cost', 'gas_cost', 'supply_cost', 'hp', 'shields', 'armor',
+    'collision_radius', 'movement_speed', 'is_flying', 'attributes',
+    'special_abilities', 'mastery_bonuses', 'commander_level',
+]
+
+
+def make_db(tmp_path: Path) -> Path:
+    """创建只包含指挥官表与标准单位表的测试数据库"""
+    db_path = tmp_path / "starcraft2.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE commanders (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, "
+                 "population_cap INTEGER, special_mechanics TEXT)")
+    conn.execute("CREATE TABLE units (id INTEGER PRIMARY KEY AUTOINCREMENT, english_id TEXT, "
+                 "chinese_name TEXT, commander_id INTEGER, hp INTEGER, armor INTEGER)")
+    conn.execute("INSERT INTO commanders (name, population_cap, special_mechanics) VALUES ('Raynor', 200, '{}')")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def write_csv(tmp_path: Path, rows) -> Path:
+    """写入合作任务单位CSV，rows为 (english_id, chinese_name, commander)"""
+    csv_path = tmp_path / "coop.csv"
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for english_id, chinese_name, commander in rows:
+            writer.writerow({
+                'english_id': english_id, 'chinese_name': chinese_name, 'base_unit': 'Marine',
+                'commander': commander, 'mineral_cost': 50, 'gas_cost': 0, 'supply_cost': 1,
+                'hp': 55, 'shields': 0, 'armor': 0, 'collision_radius': 0.375,
+                'movement_speed': 3.15, 'is_flying': 'FALSE', 'attributes': '生物',
+                'special_abilities': '[]', 'mastery_bonuses': '', 'commander_level': 90,
+            })
+    return csv_path
+
+
+def coop_unit_keys(db_path: Path):
+    """读取已导入的 (指挥官, 单位ID)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(conn.execute(
+            "SELECT c.name, cu.english_id FROM coop_units cu JOIN commanders c ON c.id = cu.commander_id"
+        ))
+    finally:
+        conn.close()
+
+
+def test_import_creates_units_and_commanders(tmp_path, capsys):
+    """导入新单位，未知指挥官自动创建且不计入导入数"""
+    db_path = make_db(tmp_path)
+    csv_path = write_csv(tmp_path, [('Marine', '陆战队员', 'Raynor'), ('Tychus', '泰凯斯', 'Tychus')])
+
+    assert import_coop_data.import_coop_units(str(csv_path), str(db_path)) is True
+
+    output = capsys.readouterr().out
+    assert "成功导入: 2 个单位" in output
+    assert "✓ 导入合作任务单位: 陆战队员" in output
+    assert coop_unit_keys(db_path) == [('Raynor', 'Marine'), ('Tychus', 'Tychus')]
+
+    # commander_id只由复合索引覆盖，不再维护冗余的单列索引
+    conn = sqlite3.connect(db_path)
+    try:
+        indexes = {name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'coop_units'")}
+    finally:
+        conn.close()
+    assert 'idx_coop_units_commander' not in indexes
+    assert 'idx_coop_units_commander_base' in indexes
+
+
+def test_rerun_skips_existing_units(tmp_path, capsys):
+    """重复导入时已存在的单位及CSV内重复行均被跳过"""
+    db_path = make_db(tmp_path)
+    csv_path = write_csv(tmp_path, [('Marine', '陆战队员', 'Raynor')])
+    import_coop_data.import_coop_units(str(csv_path), str(db_path))
+    capsys.readouterr()
+
+    csv_path = write_csv(tmp_path, [('Marine', '陆战队员', 'Raynor'), ('Medic', '医疗兵', 'Raynor'),
+                                    ('Medic', '医疗兵', 'Raynor')])
+    assert import_coop_data.import_coop_units(str(csv_path), str(db_path)) is True
+
+    output = capsys.readouterr().out
+    assert "成功导入: 1 个单位" in output
+    assert "跳过: 2 个单位" in output
+    assert coop_unit_keys(db_path) == [('Raynor', 'Marine'), ('Raynor', 'Medic')]
+
+
+def test_conflicting_rows_are_not_counted(tmp_path, capsys):
+    """预查未发现、插入时因唯一约束被忽略的行不计入导入数"""
+    db_path = make_db(tmp_path)
+    # 既有表的english_id不区分大小写，预查的键集合无法识别该冲突
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE coop_units (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            english_id TEXT NOT NULL COLLATE NOCASE, chinese_name TEXT NOT NULL, base_unit TEXT,
+            commander_id INTEGER NOT NULL, mineral_cost INTEGER NOT NULL, gas_cost INTEGER NOT NULL,
+            supply_cost REAL NOT NULL, hp INTEGER NOT NULL, shields INTEGER DEFAULT 0,
+            armor INTEGER DEFAULT 0, collision_radius REAL, movement_speed REAL NOT NULL,
+            is_flying INTEGER DEFAULT 0, attributes TEXT, special_abilities TEXT,
+            mastery_bonuses TEXT, commander_level INTEGER DEFAULT 90,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(commander_id, english_id)
+        )
+    """)
+    conn.execute("INSERT INTO coop_units (english_id, chinese_name, commander_id, mineral_cost, gas_cost, "
+                 "supply_cost, hp, movement_speed) VALUES ('marine', '陆战队员', 1, 50, 0, 1, 55, 3.15)")
+    conn.commit()
+    conn.close()
+    csv_path = write_csv(tmp_path, [('Marine', '陆战队员', 'Raynor'), ('Medic', '医疗兵', 'Raynor')])
+
+    assert import_coop_data.import_coop_units(str(csv_path), str(db_path)) is True
+
+    output = capsys.readouterr().out
+    assert "成功导入: 1 个单位" in output
+    assert "跳过: 1 个单位" in output
+    assert "✓ 导入合作任务单位: 陆战队员" not in output
@@ -0,0 +1,48 @@
+"""
+单位数据模型测试
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.models import CommanderConfig, Unit, UnitDatabase
+
+
+def make_unit(hp: int = 40, **kwargs) -> Unit:
+    """创建测试用单位"""
+    params = dict(english_id='Marine', chinese_name='陆战队员', commander='Nova',
+                  mineral_cost=50, gas_cost=0, supply_cost=1, hp=hp)
+    params.update(kwargs)
+    return Unit(**params)
+
+
+def test_apply_modifier_does_not_mutate_unit():
+    """指挥官修正作用于副本，原单位不变，重复调用不会重复缩放"""
+    config = CommanderConfig(name='Nova', modifiers={'hp': 1.5})
+    unit = make_unit()
+
+    assert config.apply_modifier(unit).hp == 60
+    assert config.apply_modifier(unit).hp == 60
+    assert unit.hp == 40
+
+
+def test_apply_modifier_uses_given_unit_and_current_modifiers():
+    """同ID的不同单位对象及修改后的修正系数都应生效"""
+    config = CommanderConfig(name='Nova', modifiers={'hp': 1.5})
+
+    assert config.apply_modifier(make_unit(hp=40)).hp == 60
+    assert config.apply_modifier(make_unit(hp=100)).hp == 150
+
+    config.modifiers['hp'] = 2.0
+    assert config.apply_modifier(make_unit(hp=40)).hp == 80
+
+
+def test_validate_data_sees_in_place_changes():
+    """原地修改单位属性后再次校验应反映最新数据"""
+    db = UnitDatabase()
+    db.add_unit(make_unit())
+    assert 'Nova_Marine: HP必须大于0' not in db.validate_data()
+
+    db.units['Nova_Marine'].hp = -5
+    assert 'Nova_Marine: HP必须大于0' in db.validate_data()
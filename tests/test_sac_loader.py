@@ -0,0 +1,106 @@
+"""
+SAC数据加载器测试
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.sac_loader import SACLoader
+
+SAC_CONFIG = """\
+compositions:
+  SAC-T:
+    name: 人类混合部队
+    description: 测试用组合
+    core_units:
+      - {name: 陆战队员, english_id: Marine, weight: 0.6, hp: 45, shield: 0, armor: 0, attributes: [轻甲, 生物], supply: 1}
+      - {name: 攻城坦克, english_id: SiegeTank, weight: 0.4, hp: 175, shield: 0, armor: 1, attributes: [重甲, 机械], supply: 3}
+    attribute_distribution: {轻甲: 0.6, 重甲: 0.4, 生物: 0.6, 机械: 0.4}
+    ehp_per_supply: 50
+    threat_profile: {primary: 地面}
+    tactical_notes: []
+evaluation_settings:
+  weights: {sac_t: 1.0}
+"""
+
+
+def write_config(directory: Path) -> Path:
+    """写入测试用SAC配置文件"""
+    path = directory / "sac.yaml"
+    path.write_text(SAC_CONFIG, encoding='utf-8')
+    return path
+
+
+def test_cache_round_trip(tmp_path):
+    """第二次加载从缓存目录读取，结果与解析一致且不在配置目录写入缓存"""
+    config_path = write_config(tmp_path)
+    cache_dir = tmp_path / "cache"
+    first = SACLoader(config_path, cache_dir=cache_dir)
+
+    assert list(cache_dir.glob("*.pkl"))
+    assert not list(tmp_path.glob("*.pkl"))
+
+    second = SACLoader(config_path, cache_dir=cache_dir)
+    assert second.get_composition("SAC-T") == first.get_composition("SAC-T")
+    assert second.get_all_weighted_ehp() == first.get_all_weighted_ehp()
+
+
+def test_weighted_ehp_matches_python_floats(tmp_path):
+    """加权EHP与校验信息中的数值与逐单位的Python浮点计算结果一致"""
+    config_path = tmp_path / "sac.yaml"
+    config_path.write_text(
+        SAC_CONFIG
+        .replace("{name: 攻城坦克, english_id: SiegeTank, weight: 0.4, hp: 175, shield: 0",
+                 "{name: 攻城坦克, english_id: SiegeTank, weight: 0.1, hp: 160, shield: 40"),
+        encoding='utf-8'
+    )
+    loader = SACLoader(config_path, use_cache=False)
+
+    total_ehp = 0
+    total_weight = 0
+    for weight, ehp in ((0.6, 45), (0.1, 160 / (1 - 1 / 11) + 40)):
+        total_ehp += ehp * weight
+        total_weight += weight
+    expected = total_ehp / total_weight
+    assert loader.get_composition("SAC-T").get_weighted_ehp() == expected
+    assert loader.get_all_weighted_ehp() == {"SAC-T": expected}
+    assert "SAC-T: 单位权重总和不等于1.0 (0.7)" in loader.validate_config()
+
+
+def test_empty_config(tmp_path):
+    """没有任何组合的配置（如项目内置的旧格式文件）可正常校验"""
+    config_path = tmp_path / "sac.yaml"
+    config_path.write_text("compositions: {}\n", encoding='utf-8')
+    loader = SACLoader(config_path, use_cache=False)
+
+    assert loader.get_all_weighted_ehp() == {}
+    assert loader.validate_config() == []
+
+    builtin = Path(__file__).parent.parent / "data" / "standard_amon_compositions.yaml"
+    assert SACLoader(builtin, use_cache=False).validate_config() == []
+
+
+def test_empty_core_units(tmp_path):
+    """所有组合都没有核心单位时，加权EHP记为0，并报告权重问题"""
+    config_path = tmp_path / "sac.yaml"
+    start = SAC_CONFIG.index("      - {name: 陆战队员")
+    end = SAC_CONFIG.index("    attribute_distribution")
+    config_path.write_text(
+        SAC_CONFIG[:start].replace("core_units:\n", "core_units: []\n") + SAC_CONFIG[end:],
+        encoding='utf-8'
+    )
+    loader = SACLoader(config_path, use_cache=False)
+
+    assert loader.get_all_weighted_ehp() == {"SAC-T": 0.0}
+    assert loader.get_composition("SAC-T").get_weighted_ehp() == 0.0
+    assert "SAC-T: 单位权重总和不等于1.0 (0.0)" in loader.validate_config()
+
+
+def test_validate_reports_nan_coverage(tmp_path):
+    """NaN覆盖率与超出范围的覆盖率一样被报告"""
+    config_path = tmp_path / "sac.yaml"
+    config_path.write_text(SAC_CONFIG.replace("机械: 0.4}", "机械: .nan}"), encoding='utf-8')
+    loader = SACLoader(config_path, use_cache=False)
+
+    assert "SAC-T: 属性'机械'覆盖率超出范围 (nan)" in loader.validate_config()
@@ -0,0 +1,150 @@
+"""
+YAML数据加载器测试
+"""
+
+import os
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.yaml_loader import (
+    CACHE_DIR_ENV, YAMLDataLoader, cache_path_for, default_cache_dir, load_cached, store_cached
+)
+
+
+def write_unit(directory: Path, unit_id: str, life: int = 100) -> Path:
+    """写入测试用单位文件"""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{unit_id.lower()}.yaml"
+    path.write_text(
+        "unit:\n"
+        f"  id: {unit_id}\n"
+        f"  name: {unit_id}\n"
+        f"  name_en: {unit_id}\n"
+        "  commander: Nova\n"
+        "  race: Terran\n"
+        "  stats:\n"
+        f"    life: {life}\n",
+        encoding='utf-8'
+    )
+    return path
+
+
+def bump_mtime(path: Path) -> None:
+    """将文件修改时间后移，确保与缓存中记录的不同"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_parse_files_keeps_block_scalars(tmp_path):
+    """多个文件一起解析时，保留末尾换行的块标量值与单独解析一致"""
+    for name in ('a', 'b', 'c'):
+        (tmp_path / f"{name}.yaml").write_text("keep: |+\n  line\nfolded: >+\n  text\n", encoding='utf-8')
+    loader = YAMLDataLoader(tmp_path, use_cache=False)
+
+    results = loader._parse_files(sorted(tmp_path.glob("*.yaml")))
+
+    assert results == [({'keep': 'line\n', 'folded': 'text\n'}, None)] * 3
+
+
+def test_parse_files_reports_error_per_file(tmp_path):
+    """语法错误只影响出错的文件"""
+    (tmp_path / "good.yaml").write_text("id: ok\n", encoding='utf-8')
+    (tmp_path / "bad.yaml").write_text("id: [unclosed\n", encoding='utf-8')
+    loader = YAMLDataLoader(tmp_path, use_cache=False)
+
+    (bad, bad_error), (good, good_error) = loader._parse_files(sorted(tmp_path.glob("*.yaml")))
+
+    assert bad is None and bad_error is not None
+    assert good == {'id': 'ok'} and good_error is None
+
+
+def test_cache_is_stored_outside_data_dir(tmp_path):
+    """缓存写入独立的缓存目录，数据目录中不产生pickle文件"""
+    data_root, cache_dir = tmp_path / "data", tmp_path / "cache"
+    write_unit(data_root / "units", "Marine")
+
+    YAMLDataLoader(data_root, cache_dir=cache_dir).load_units()
+
+    assert not list(data_root.rglob("*.pkl"))
+    assert cache_path_for(data_root / "units" / "marine.yaml", cache_dir).exists()
+
+
+def test_cache_dir_defaults_to_env_var(tmp_path, monkeypatch):
+    """默认缓存目录可通过环境变量配置"""
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+
+    assert default_cache_dir() == tmp_path
+
+
+def test_cache_invalidated_when_source_changes(tmp_path):
+    """源文件修改后缓存失效，重新解析得到新数据"""
+    data_root, cache_dir = tmp_path / "data", tmp_path / "cache"
+    path = write_unit(data_root / "units", "Marine", life=45)
+    assert YAMLDataLoader(data_root, cache_dir=cache_dir).get_unit("Marine").life == 45
+
+    write_unit(data_root / "units", "Marine", life=55)
+    bump_mtime(path)
+
+    assert load_cached(path, cache_dir=cache_dir) is None
+    assert YAMLDataLoader(data_root, cache_dir=cache_dir).get_unit("Marine").life == 55
+
+
+def test_cache_invalidated_when_schema_changes(tmp_path):
+    """结构哈希不一致时不使用缓存"""
+    path = write_unit(tmp_path / "units", "Marine")
+    store_cached(path, "parsed", schema="old", cache_dir=tmp_path / "cache")
+
+    assert load_cached(path, schema="old", cache_dir=tmp_path / "cache") == "parsed"
+    assert load_cached(path, schema="new", cache_dir=tmp_path / "cache") is None
+
+
+def test_cache_is_keyed_by_source_path(tmp_path):
+    """不同数据目录中的同名文件不共用缓存"""
+    first = write_unit(tmp_path / "a" / "units", "Marine")
+    second = write_unit(tmp_path / "b" / "units", "Marine")
+    store_cached(first, "first", cache_dir=tmp_path / "cache")
+
+    assert cache_path_for(first, tmp_path / "cache") != cache_path_for(second, tmp_path / "cache")
+    assert load_cached(second, cache_dir=tmp_path / "cache") is None
+
+
+def test_get_unit_loads_only_indexed_file(tmp_path):
+    """按需加载时只解析文件头索引指向的文件"""
+    for unit_id in ("Marine", "Marauder", "Reaper"):
+        write_unit(tmp_path / "units", unit_id)
+    loader = YAMLDataLoader(tmp_path, use_cache=False)
+
+    assert loader.get_unit("Marauder").id == "Marauder"
+    assert list(loader.units) == ["Marauder"]
+
+    loader.load_units()
+    assert sorted(loader.units) == ["Marauder", "Marine", "Reaper"]
+
+
+def test_get_unit_falls_back_when_header_has_no_id(tmp_path):
+    """文件头中找不到ID时回退到这类文件，并且只加载这类文件"""
+    write_unit(tmp_path / "units", "Reaper")
+    path = write_unit(tmp_path / "units", "Marine")
+    path.write_text("# " + "\n# ".join(["注释"] * 40) + "\n" + path.read_text(encoding='utf-8'),
+                    encoding='utf-8')
+    loader = YAMLDataLoader(tmp_path, use_cache=False)
+
+    assert loader.get_unit("Marine").id == "Marine"
+    assert loader.get_unit("Ghost") is None
+    assert list(loader.units) == ["Marine"]
+
+
+def test_get_unit_miss_does_not_load_indexed_files(tmp_path, caplog):
+    """所有文件都已建立索引时，查找不存在的ID不加载任何文件"""
+    for unit_id in ("Marine", "Marauder", "Reaper"):
+        write_unit(tmp_path / "units", unit_id)
+    loader = YAMLDataLoader(tmp_path, use_cache=False)
+
+    with caplog.at_level("INFO"):
+        assert loader.get_unit("Nope") is None
+
+    assert loader.units == {}
+    assert not caplog.records
+    loader.load_units()
+    assert sorted(loader.units) == ["Marauder", "Marine", "Reaper"]
@@ -7,6 +7,35 @@
 import csv
 import sqlite3
 from pathlib import Path
+from typing import Optional
+
+
+# 预先定义的插入语句，保证语句缓存按同一对象命中
+INSERT_COMMANDER_SQL = """
+    INSERT INTO commanders (name, population_cap, special_mechanics)
+    VALUES (?, 200, '{}')
+"""
+
+INSERT_COOP_UNIT_SQL = """
+    INSERT INTO coop_units (
+        english_id, chinese_name, base_unit, commander_id,
+        mineral_cost, gas_cost, supply_cost,
+        hp, shields, armor, collision_radius,
+        movement_speed, is_flying, attributes,
+        special_abilities, mastery_bonuses, commander_level
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(commander_id, english_id) DO NOTHING
+"""
+
+
+def connect_db(db_path) -> sqlite3.Connection:
+    """打开数据库连接并设置WAL日志、NORMAL同步级别与较大的页缓存"""
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -65536")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
 
 
 def create_coop_units_table(cursor):
@@ -37,8 +66,12 @@ def create_coop_units_table(cursor):
         );
     """)
     
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_coop_units_commander ON coop_units(commander_id);")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_coop_units_base ON coop_units(base_unit);")
+    # 标准单位对比按 (commander_id, base_unit) 连接
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_coop_units_commander_base ON coop_units(commander_id, base_unit);")
+    # 按commander_id的查询已由上面的复合索引及UNIQUE(commander_id, english_id)覆盖，
+    # 删除旧版本创建的单列索引，避免每次插入多维护一个冗余索引
+    cursor.execute("DROP INDEX IF EXISTS idx_coop_units_commander;")
 
 
 def get_commander_id(cursor, commander_name: str) -> int:
@@ -50,15 +83,13 @@ def get_commander_id(cursor, commander_name: str) -> int:
         return result[0]
     
     # 如果指挥官不存在，创建一个
-    cursor.execute("""
-        INSERT INTO commanders (name, population_cap, special_mechanics)
-        VALUES (?, 200, '{}')
-    """, (commander_name, ))
+    cursor.execute(INSERT_COMMANDER_SQL, (commander_name, ))
     
     return cursor.lastrowid
 
 
-def import_coop_units(csv_file: str, db_path: str = "data/starcraft2.db"):
+def import_coop_units(csv_file: str, db_path: str = "data/starcraft2.db",
+                      conn: Optional[sqlite3.Connection] = None):
     """导入合作任务单位数据"""
     csv_path = Path(csv_file)
     if not csv_path.exists():
@@ -72,44 +103,49 @@ def import_coop_units(csv_file: str, db_path: str = "data/starcraft2.db"):
     
     print(f"正在导入合作任务数据: {csv_file} -> {db_path}")
     
-    conn = sqlite3.connect(str(db_file))
+    # 复用调用方传入的连接，只关闭自己打开的连接
+    owns_conn = conn is None
+    if owns_conn:
+        conn = connect_db(db_file)
     cursor = conn.cursor()
     
     try:
+        # 建表与全部插入放在同一个写事务中，只在结尾提交一次
+        cursor.execute("BEGIN IMMEDIATE")
+        
         # 创建合作任务单位表
         create_coop_units_table(cursor)
         
-        imported_count = 0
         skipped_count = 0
+        # 送入批量插入的单位名称
+        pending_names = []
+        # 一次性取出指挥官ID与已存在的单位键，代替逐行查询
+        commander_ids = dict(cursor.execute("SELECT name, id FROM commanders"))
+        known_keys = set(cursor.execute("SELECT commander_id, english_id FROM coop_units"))
+        # 边读CSV边插入，新指挥官走独立游标
+        lookup_cursor = conn.cursor()
         
-        with open(csv_path, 'r', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
+        def iter_new_rows(reader):
+            """逐行转换CSV，产出待插入的合作任务单位参数"""
+            nonlocal skipped_count
             
             for row in reader:
                 try:
-                    # 获取指挥官ID
-                    commander_id = get_commander_id(cursor, row['commander'])
-                    
-                    # 检查单位是否已存在
-                    cursor.execute("""
-                        SELECT id FROM coop_units WHERE english_id = ? AND commander_id = ?
-                    """, (row['english_id'], commander_id))
+                    # 获取指挥官ID，未知指挥官才访问数据库
+                    commander_id = commander_ids.get(row['commander'])
+                    if commander_id is None:
+                        commander_id = get_commander_id(lookup_cursor, row['commander'])
+                        commander_ids[row['commander']] = commander_id
                     
-                    if cursor.fetchone():
+                    # 检查单位是否已存在（包括本次导入中已插入的行）
+                    key = (commander_id, row['english_id'])
+                    if key in known_keys:
                         print(f"合作任务单位 '{row['chinese_name']}' 已存在，跳过")
                         skipped_count += 1
                         continue
                     
-                    # 插入合作任务单位数据
-                    cursor.execute("""
-                        INSERT INTO coop_units (
-                            english_id, chinese_name, base_unit, commander_id,
-                            mineral_cost, gas_cost, supply_cost,
-                            hp, shields, armor, collision_radius,
-                            movement_speed, is_flying, attributes,
-                            special_abilities, mastery_bonuses, commander_level
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
+                    # 先转换整行，转换失败的行不会进入批量插入
+                    values = (
                         row['english_id'],
                         row['chinese_name'],
                         row.get('base_unit', ''),
@@ -127,27 +163,52 @@ def import_coop_units(csv_file: str, db_path: str = "data/starcraft2.db"):
                         row.get('special_abilities', '[]'),
                         row.get('mastery_bonuses', ''),
                         int(row.get('commander_level', 90))
-                    ))
-                    
-                    unit_id = cursor.lastrowid
-                    print(f"✓ 导入合作任务单位: {row['chinese_name']} (ID: {unit_id})")
-                    imported_count += 1
+                    )
                     
                 except Exception as e:
                     print(f"处理行时出错: {row.get('chinese_name', 'Unknown')}: {e}")
                     skipped_count += 1
                     continue
+                
+                known_keys.add(key)
+                pending_names.append(row['chinese_name'])
+                yield values
+        
+        with open(csv_path, 'r', encoding='utf-8-sig') as csvfile:
+            reader = csv.DictReader(csvfile)
+            
+            # 插入合作任务单位数据，复用同一条预编译语句批量绑定
+            cursor.executemany(INSERT_COOP_UNIT_SQL, iter_new_rows(reader))
+        
+        # executemany的rowcount只含实际插入的行，因ON CONFLICT未插入的行不计入
+        imported_count = cursor.rowcount
+        if imported_count == len(pending_names):
+            for name in pending_names:
+                print(f"✓ 导入合作任务单位: {name}")
+        else:
+            conflict_count = len(pending_names) - imported_count
+            print(f"✓ 导入合作任务单位 {imported_count} 个，{conflict_count} 个插入时已存在，跳过")
+            skipped_count += conflict_count
         
         # 提交事务
         conn.commit()
         
+        # 批量写入后刷新统计信息，供后续验证与对比查询规划使用；
+        # 数据此时已提交，刷新失败不影响导入结果
+        if imported_count:
+            try:
+                cursor.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                print(f"刷新统计信息失败: {e}")
+        
     except Exception as e:
         print(f"导入过程中出错: {e}")
         conn.rollback()
         return False
         
     finally:
-        conn.close()
+        if owns_conn:
+            conn.close()
     
     print(f"\n合作任务数据导入完成:")
     print(f"成功导入: {imported_count} 个单位")
@@ -156,14 +217,18 @@ def import_coop_units(csv_file: str, db_path: str = "data/starcraft2.db"):
     return imported_count > 0
 
 
-def verify_coop_import(db_path: str = "data/starcraft2.db"):
+def verify_coop_import(db_path: str = "data/starcraft2.db",
+                       conn: Optional[sqlite3.Connection] = None):
     """验证合作任务数据导入"""
     db_file = Path(db_path)
     if not db_file.exists():
         print(f"数据库文件不存在: {db_path}")
         return
     
-    conn = sqlite3.connect(str(db_file))
+    # 复用调用方传入的连接，只关闭自己打开的连接
+    owns_conn = conn is None
+    if owns_conn:
+        conn = connect_db(db_file)
     cursor = conn.cursor()
     
     try:
@@ -177,17 +242,20 @@ def verify_coop_import(db_path: str = "data/starcraft2.db"):
             print("合作任务单位表不存在")
             return
         
-        # 统计合作任务单位数量
-        cursor.execute("SELECT COUNT(*) FROM coop_units")
-        total_coop_units = cursor.fetchone()[0]
+        # 一次查询同时统计合作任务单位与标准单位数量
+        table_counts = dict(cursor.execute("""
+            SELECT 'coop_units', COUNT(*) FROM coop_units
+            UNION ALL
+            SELECT 'units', COUNT(*) FROM units
+        """))
+        total_coop_units = table_counts['coop_units']
         
-        # 按指挥官统计
+        # 按指挥官统计，内连接直接排除没有单位的指挥官
         cursor.execute("""
             SELECT c.name, COUNT(cu.id) as unit_count
             FROM commanders c
-            LEFT JOIN coop_units cu ON c.id = cu.commander_id
+            JOIN coop_units cu ON c.id = cu.commander_id
             GROUP BY c.id, c.name
-            HAVING unit_count > 0
             ORDER BY unit_count DESC
         """)
         
@@ -221,8 +289,7 @@ def verify_coop_import(db_path: str = "data/starcraft2.db"):
                 print(f"  {unit_name} ({commander}) - 基于: {base_unit}")
         
         # 对比标准单位
-        cursor.execute("SELECT COUNT(*) FROM units")
-        standard_units = cursor.fetchone()[0]
+        standard_units = table_counts['units']
         
         print(f"\n数据对比:")
         print(f"标准单位: {standard_units} 个")
@@ -245,12 +312,16 @@ def verify_coop_import(db_path: str = "data/starcraft2.db"):
                 print(f"    精通: {mastery}")
             
     finally:
-        conn.close()
+        if owns_conn:
+            conn.close()
 
 
-def compare_standard_vs_coop(db_path: str = "data/starcraft2.db"):
+def compare_standard_vs_coop(db_path: str = "data/starcraft2.db",
+                             conn: Optional[sqlite3.Connection] = None):
     """对比标准单位与合作任务单位"""
-    conn = sqlite3.connect(str(db_path))
+    owns_conn = conn is None
+    if owns_conn:
+        conn = connect_db(db_path)
     cursor = conn.cursor()
     
     try:
@@ -291,7 +362,8 @@ def compare_standard_vs_coop(db_path: str = "data/starcraft2.db"):
     except Exception as e:
         print(f"对比过程出错: {e}")
     finally:
-        conn.close()
+        if owns_conn:
+            conn.close()
 
 
 def main():
@@ -304,17 +376,27 @@ def main():
     
     csv_file = sys.argv[1]
     
-    # 导入合作任务数据
-    success = import_coop_units(csv_file)
+    db_file = Path("data/starcraft2.db")
+    if not db_file.exists():
+        print(f"错误: 数据库文件不存在: {db_file}")
+        return
     
-    if success:
-        print("\n✅ 合作任务数据导入成功！")
-        # 验证导入结果
-        verify_coop_import()
-        # 对比分析
-        compare_standard_vs_coop()
-    else:
-        print("\n❌ 合作任务数据导入失败！")
+    # 导入、验证与对比共用同一个连接
+    conn = connect_db(db_file)
+    try:
+        # 导入合作任务数据
+        success = import_coop_units(csv_file, conn=conn)
+        
+        if success:
+            print("\n✅ 合作任务数据导入成功！")
+            # 验证导入结果
+            verify_coop_import(conn=conn)
+            # 对比分析
+            compare_standard_vs_coop(conn=conn)
+        else:
+            print("\n❌ 合作任务数据导入失败！")
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":